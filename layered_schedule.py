@@ -0,0 +1,245 @@
+import contextlib
+import threading
+
+_DELETED = object()  # Marks a date that an overlay removes from the layers below it
+_ABSENT = object()  # Marks a date that a layer has no entry for at all
+
+
+class ScheduleLayer:
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.changes = {}  # {date: (task, ...) or _DELETED} -- only the dates this layer touches
+        self.undo_stack = []  # [((date, removed_tasks, added_tasks), ...), ...]
+        self.redo_stack = []
+
+    def lookup(self, date_str):
+        layer = self
+        while layer is not None:
+            entry = layer.changes.get(date_str, _ABSENT)
+            if entry is not _ABSENT:
+                return entry
+            layer = layer.parent
+        return _DELETED
+
+
+class LayeredSchedule:
+    # A base calendar plus copy-on-write overlays for temporary edits. Each overlay only
+    # stores the days it changes and shares everything else with the layers below it, so
+    # previewing, discarding or committing a temporary change costs as much as the change.
+    # Days are stored as tuples so they can be shared between layers without copying.
+    # History records which tasks an edit removed and added rather than whole days, so
+    # tasks written outside the history (see add_base_task) survive undo and redo.
+
+    def __init__(self, tasks=None):
+        self.base = ScheduleLayer()
+        self.top = self.base
+        self.listeners = []  # [callback(date_str, old_tasks, new_tasks), ...] -- run whenever a visible day changes
+        self.pending_step = None  # Entries collected by an open batch()
+        self.lock = threading.RLock()  # Held for each whole edit, read through _notify; background threads edit too
+        for date_str, task_list in (tasks or {}).items():
+            if task_list:
+                self.base.changes[date_str] = tuple(task_list)
+
+    # Reading
+
+    def get(self, date_str, default=None):
+        entry = self.top.lookup(date_str)
+        return default if entry is _DELETED else entry
+
+    def __getitem__(self, date_str):
+        entry = self.top.lookup(date_str)
+        if entry is _DELETED:
+            raise KeyError(date_str)
+        return entry
+
+    def __contains__(self, date_str):
+        return self.top.lookup(date_str) is not _DELETED
+
+    def items(self):
+        with self.lock:
+            merged = {}
+            layers = []
+            layer = self.top
+            while layer is not None:
+                layers.append(layer)
+                layer = layer.parent
+            for layer in reversed(layers):
+                merged.update(layer.changes)
+            return [(date_str, task_list) for date_str, task_list in merged.items() if task_list is not _DELETED]
+
+    def keys(self):
+        return [date_str for date_str, _ in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    # Editing
+
+    def set_day(self, date_str, task_list):
+        with self.lock:
+            old_tasks = self.get(date_str, ())
+            new_tasks = tuple(task_list)
+            removed, added = _diff(old_tasks, new_tasks)
+            self._store(self.top, date_str, new_tasks)
+            if removed or added:
+                self._record((date_str, removed, added))
+            self._notify(date_str, old_tasks)
+
+    def add_task(self, date_str, task):
+        with self.lock:
+            self.set_day(date_str, self.get(date_str, ()) + (task,))
+
+    def remove_tasks(self, date_str, task_title):
+        with self.lock:
+            day_tasks = self.get(date_str, ())
+            new_tasks = tuple(task for task in day_tasks if task[0] != task_title)
+            removed = len(day_tasks) - len(new_tasks)
+            if removed:
+                self.set_day(date_str, new_tasks)
+            return removed
+
+    def add_base_task(self, date_str, task):
+        # For tasks the app generates itself (e.g. recurring occurrences): they go straight into
+        # the permanent calendar, are not undoable and leave redo alone. Overlays that already
+        # edit the day get the task too, so it is still visible there and survives a commit.
+        with self.lock:
+            old_tasks = self.get(date_str, ())
+            layer = self.top
+            while layer is not None:
+                if layer is self.base or date_str in layer.changes:
+                    entry = layer.changes.get(date_str, ())
+                    layer.changes[date_str] = (() if entry is _DELETED else entry) + (task,)
+                layer = layer.parent
+            self._notify(date_str, old_tasks)
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Groups every edit made inside the block into one undo step. The lock is held for the
+        # whole block so edits from other threads can't end up in the step.
+        with self.lock:
+            if self.pending_step is not None:
+                yield
+                return
+            self.pending_step = []
+            try:
+                yield
+            finally:
+                step, self.pending_step = tuple(self.pending_step), None
+                if step:
+                    self.top.undo_stack.append(step)
+                    self.top.redo_stack.clear()
+
+    # Undo / redo
+
+    def can_undo(self):
+        return bool(self.top.undo_stack)
+
+    def can_redo(self):
+        return bool(self.top.redo_stack)
+
+    def undo(self):
+        with self.lock:
+            if not self.top.undo_stack:
+                return False
+            step = self.top.undo_stack.pop()
+            for date_str, removed, added in reversed(step):
+                self._patch(date_str, added, removed)
+            self.top.redo_stack.append(step)
+            return True
+
+    def redo(self):
+        with self.lock:
+            if not self.top.redo_stack:
+                return False
+            step = self.top.redo_stack.pop()
+            for date_str, removed, added in step:
+                self._patch(date_str, removed, added)
+            self.top.undo_stack.append(step)
+            return True
+
+    # Temporary overlays
+
+    def is_temporary(self):
+        return self.top is not self.base
+
+    def begin_overlay(self):
+        with self.lock:
+            self.top = ScheduleLayer(self.top)
+
+    def discard_overlay(self):
+        with self.lock:
+            if not self.is_temporary():
+                return False
+            overlay = self.top
+            old_days = {date_str: self.get(date_str, ()) for date_str in overlay.changes}
+            self.top = overlay.parent
+            for date_str, old_tasks in old_days.items():
+                self._notify(date_str, old_tasks)
+            return True
+
+    def commit_overlay(self):
+        # Folds the overlay into the layer below as a single undoable step. Only the
+        # overlay's own dates are touched; the rest of the calendar is never copied.
+        # The visible schedule is unchanged, so listeners are not notified.
+        with self.lock:
+            if not self.is_temporary():
+                return False
+            overlay = self.top
+            self.top = overlay.parent
+            with self.batch():
+                for date_str, entry in overlay.changes.items():
+                    old_tasks = self.get(date_str, ())
+                    new_tasks = () if entry is _DELETED else entry
+                    removed, added = _diff(old_tasks, new_tasks)
+                    self._store(self.top, date_str, new_tasks)
+                    if removed or added:
+                        self._record((date_str, removed, added))
+            return True
+
+    # Internals
+
+    def _store(self, layer, date_str, task_list):
+        if task_list:
+            layer.changes[date_str] = task_list
+        elif layer.parent is None or layer.parent.lookup(date_str) is _DELETED:
+            layer.changes.pop(date_str, None)  # Nothing below to hide, so drop the date entirely
+        else:
+            layer.changes[date_str] = _DELETED
+
+    def _record(self, entry):
+        if self.pending_step is not None:
+            self.pending_step.append(entry)
+        else:
+            self.top.undo_stack.append((entry,))
+            self.top.redo_stack.clear()
+
+    def _patch(self, date_str, take, give):
+        old_tasks = self.get(date_str, ())
+        remaining = list(old_tasks)
+        for task in take:
+            if task in remaining:
+                remaining.remove(task)
+        self._store(self.top, date_str, tuple(remaining) + give)
+        self._notify(date_str, old_tasks)
+
+    def _notify(self, date_str, old_tasks):
+        new_tasks = self.get(date_str, ())
+        if new_tasks is old_tasks:
+            return
+        for listener in self.listeners:
+            listener(date_str, old_tasks, new_tasks)
+
+
+def _diff(old_tasks, new_tasks):
+    # (removed, added) between two versions of a day, compared as multisets
+    added = list(new_tasks)
+    removed = []
+    for task in old_tasks:
+        if task in added:
+            added.remove(task)
+        else:
+            removed.append(task)
+    return tuple(removed), tuple(added)
@@ -10,6 +10,8 @@ import pytesseract
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 import requests
+from layered_schedule import LayeredSchedule
+from workload_analytics import WorkloadAnalytics
 
 class PlannerApp:
     def __init__(self, root):
@@ -18,7 +20,8 @@ class PlannerApp:
         self.root.minsize(800, 600)  # Increased size
         self.root.geometry("800x600")
 
-        self.tasks = {}  # {date: [(title, type, time, location, reminder, image_path, recurring_days), ...]}
+        self.tasks = LayeredSchedule()  # {date: ((title, type, time, location, reminder, image_path, recurring_days), ...)}
+        self.analytics = WorkloadAnalytics(self.tasks)  # Workload arrays, kept in sync with self.tasks
         self.default_tasks = []  # [(title, type, time, location), ...]
         self.reminder_jobs = {}  # {task_id: schedule_job}
         self.next_task_id = 1
@@ -33,7 +36,18 @@ class PlannerApp:
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Import Image Schedule", command=self.import_image_schedule)
         menu_bar.add_cascade(label="File", menu=file_menu)
+        edit_menu = tk.Menu(menu_bar, tearoff=0)
+        edit_menu.add_command(label="Undo", command=self.undo_edit, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Redo", command=self.redo_edit, accelerator="Ctrl+Y")
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Start Temporary Edit", command=self.start_temporary_edit)
+        edit_menu.add_command(label="Keep Temporary Edit", command=self.commit_temporary_edit)
+        edit_menu.add_command(label="Discard Temporary Edit", command=self.discard_temporary_edit)
+        menu_bar.add_cascade(label="Edit", menu=edit_menu)
         self.root.config(menu=menu_bar)
+        # bind_all so the shortcuts also work in the task windows; text fields keep their own undo
+        self.root.bind_all("<Control-z>", lambda event: self.on_history_key(event, self.undo_edit))
+        self.root.bind_all("<Control-y>", lambda event: self.on_history_key(event, self.redo_edit))
 
         # Calendar Frame
         self.calendar_frame = ttk.Frame(self.root, padding="10")
@@ -54,6 +68,11 @@ class PlannerApp:
         ttk.Button(self.button_frame, text="Show Month", command=self.show_month_calendar).grid(row=0, column=3, padx=5)
         ttk.Button(self.button_frame, text="Show Week", command=self.show_week_calendar).grid(row=0, column=4, padx=5)
         ttk.Button(self.button_frame, text="Default Tasks", command=self.manage_default_tasks).grid(row=0, column=5, padx=5)
+        ttk.Button(self.button_frame, text="Workload", command=self.show_workload).grid(row=0, column=6, padx=5)
+
+        # Temporary edit status
+        self.edit_status = ttk.Label(self.button_frame, text="")
+        self.edit_status.grid(row=1, column=0, columnspan=7, sticky=tk.W, pady=(5, 0))
 
     def show_week_calendar(self):
         self.clear_calendar_frame()
@@ -72,6 +91,7 @@ class PlannerApp:
         self.clear_calendar_frame()
         today = datetime.date.today()
         month_calendar = calendar.monthcalendar(today.year, today.month)
+        day_colors = self.analytics.month_colors(today.year, today.month)
         for row_index, week in enumerate(month_calendar):
             for col_index, day in enumerate(week):
                 day_str = ""
@@ -79,6 +99,8 @@ class PlannerApp:
                     current_day = datetime.date(today.year, today.month, day)
                     day_str = current_day.strftime("%Y-%m-%d")
                     day_label = ttk.Label(self.calendar_frame, text=day_str)
+                    if day_colors[day - 1]:
+                        day_label.config(background=day_colors[day - 1])
                     day_label.grid(row=row_index, column=col_index, padx=5, pady=5)
                     day_tasks = self.tasks.get(day_str, [])
                     for j, task in enumerate(day_tasks):
@@ -88,6 +110,26 @@ class PlannerApp:
                     empty_label = ttk.Label(self.calendar_frame, text="")
                     empty_label.grid(row=row_index, column=col_index, padx=5, pady=5)
 
+    def show_workload(self):
+        today = datetime.date.today()
+        self.task_list.config(state=tk.NORMAL)
+        self.task_list.delete(1.0, tk.END)
+        self.task_list.insert(tk.END, f"Busiest days in {today.year}:\n")
+        for date_str, load in self.analytics.busiest_days(year=today.year):
+            self.task_list.insert(tk.END, f"- {date_str}: {load} tasks\n")
+        alerts = [date_str for date_str in self.analytics.overload_alerts() if date_str >= str(today)]
+        self.task_list.insert(tk.END, "Overloaded days coming up:\n")
+        for date_str in alerts:
+            self.task_list.insert(tk.END, f"- {date_str}\n")
+        if not alerts:
+            self.task_list.insert(tk.END, "- None\n")
+        for heading, totals in (("Tasks by type", self.analytics.type_totals(today.year)),
+                                ("Tasks by location", self.analytics.location_totals(today.year))):
+            if totals:
+                summary = ", ".join(f"{name}: {count}" for name, count in sorted(totals.items(), key=lambda item: -item[1]))
+                self.task_list.insert(tk.END, f"{heading} in {today.year}: {summary}\n")
+        self.task_list.config(state=tk.DISABLED)
+
     def clear_calendar_frame(self):
         for widget in self.calendar_frame.winfo_children():
             widget.destroy()
@@ -190,11 +232,7 @@ class PlannerApp:
             recurring_days = recurring_days_str.split(',') if recurring_days_str else []
 
             task = (task_title, task_type, time, location, reminder, image_path, recurring_days)
-
-            if date_str in self.tasks:
-                self.tasks[date_str].append(task)
-            else:
-                self.tasks[date_str] = [task]
+            self.tasks.add_task(date_str, task)
 
             messagebox.showinfo("Success", "Task added successfully!")
             task_window.destroy()
@@ -227,14 +265,7 @@ class PlannerApp:
         task_to_delete = simpledialog.askstring("Delete Task", "Enter task title:")
 
         if date_str and task_to_delete and date_str in self.tasks:
-            new_tasks = []
-            for task in self.tasks[date_str]:
-                if task[0] != task_to_delete:
-                    new_tasks.append(task)
-            if len(new_tasks) < len(self.tasks[date_str]):
-                self.tasks[date_str] = new_tasks
-                if not new_tasks:
-                    del self.tasks[date_str]
+            if self.tasks.remove_tasks(date_str, task_to_delete):
                 messagebox.showinfo("Success", "Task deleted successfully!")
                 self.show_week_calendar()
                 self.schedule_reminders()
@@ -243,6 +274,48 @@ class PlannerApp:
         else:
             messagebox.showerror("Error", "Task not found.")
 
+    def refresh_after_edit(self):
+        if self.tasks.is_temporary():
+            self.edit_status.config(text="Temporary edit in progress - keep or discard it from the Edit menu.")
+        else:
+            self.edit_status.config(text="")
+        self.show_week_calendar()
+        self.schedule_reminders()
+
+    def on_history_key(self, event, action):
+        if isinstance(event.widget, (tk.Entry, tk.Text, tk.Spinbox)):  # ttk.Entry and ttk.Combobox are tk.Entry
+            return
+        action()
+
+    def undo_edit(self):
+        if self.tasks.undo():
+            self.refresh_after_edit()
+
+    def redo_edit(self):
+        if self.tasks.redo():
+            self.refresh_after_edit()
+
+    def start_temporary_edit(self):
+        if self.tasks.is_temporary():
+            messagebox.showerror("Error", "A temporary edit is already in progress.")
+            return
+        self.tasks.begin_overlay()
+        self.refresh_after_edit()
+
+    def commit_temporary_edit(self):
+        if self.tasks.commit_overlay():
+            messagebox.showinfo("Success", "Temporary changes saved to the schedule.")
+            self.refresh_after_edit()
+        else:
+            messagebox.showerror("Error", "No temporary edit in progress.")
+
+    def discard_temporary_edit(self):
+        if self.tasks.discard_overlay():
+            messagebox.showinfo("Success", "Temporary changes discarded.")
+            self.refresh_after_edit()
+        else:
+            messagebox.showerror("Error", "No temporary edit in progress.")
+
     def import_image_schedule(self):
         filename = filedialog.askopenfilename(initialdir="./", title="Select Image",
                                              filetypes=(("Image files", "*.png;*.jpg;*.jpeg"), ("all files", "*.*")))
@@ -256,16 +329,17 @@ class PlannerApp:
     def parse_schedule_text(self, text):
         # This is a very basic example; you'll need to adapt it to your schedule format
         lines = text.split('\n')
-        for line in lines:
-            parts = line.split(' ')  # Simple split; improve with regex for complex formats
-            if len(parts) >= 3:
-                try:
-                    date_str = parts[0]
-                    datetime.datetime.strptime(date_str, "%Y-%m-%d")  # Validate date
-                    task_title = ' '.join(parts[1:])
-                    self.add_task(date_str, task_title, "General", None, None, None, None, None, None)
-                except ValueError:
-                    pass  # Skip lines that don't match date format
+        with self.tasks.batch():  # One undo step for the whole import
+            for line in lines:
+                parts = line.split(' ')  # Simple split; improve with regex for complex formats
+                if len(parts) >= 3:
+                    try:
+                        date_str = parts[0]
+                        datetime.datetime.strptime(date_str, "%Y-%m-%d")  # Validate date
+                        task_title = ' '.join(parts[1:])
+                        self.add_task(date_str, task_title, "General", None, None, None, None, None, None)
+                    except ValueError:
+                        pass  # Skip lines that don't match date format
         self.show_week_calendar()
         self.schedule_reminders()
 
@@ -311,10 +385,7 @@ class PlannerApp:
             if date_str:
                 try:
                     datetime.datetime.strptime(date_str, "%Y-%m-%d")
-                    if date_str in self.tasks:
-                        self.tasks[date_str].append(task)
-                    else:
-                        self.tasks[date_str] = [task]
+                    self.tasks.add_task(date_str, task)
                     self.show_week_calendar()
                     self.schedule_reminders()
                     messagebox.showinfo("Success", "Default task added to schedule.")
@@ -386,10 +457,7 @@ class PlannerApp:
                 print(f"Error checking weather/traffic for {title}: {e}")
 
     def suggest_breaks(self, date_str):
-        tasks = self.tasks.get(date_str, [])
-        time_specific_tasks = [task for task in tasks if task[2]]  # Check for time
-
-        if len(time_specific_tasks) > 2:
+        if self.analytics.is_overloaded(date_str):  # Same rule as the month view and overload alerts
             messagebox.showinfo("Break Reminder",
                               "Consider scheduling breaks today to avoid stress. (AI-powered personalized suggestions are a future feature!)")
 
@@ -445,17 +513,15 @@ class PlannerApp:
 
         if task_title and selected_days:
             today = datetime.date.today()
-            for day in selected_days:
-                day_index = days_of_week.index(day)
-                days_until_next = (day_index - today.weekday()) % 7
-                next_occurrence = today + datetime.timedelta(days=days_until_next)
-                date_str = next_occurrence.strftime("%Y-%m-%d")
-
-                task = (task_title, "To-Do", None, None, None, None, [day])  # Store the day in recurring_days
-                if date_str in self.tasks:
-                    self.tasks[date_str].append(task)
-                else:
-                    self.tasks[date_str] = [task]
+            with self.tasks.batch():  # One undo step for all selected days
+                for day in selected_days:
+                    day_index = days_of_week.index(day)
+                    days_until_next = (day_index - today.weekday()) % 7
+                    next_occurrence = today + datetime.timedelta(days=days_until_next)
+                    date_str = next_occurrence.strftime("%Y-%m-%d")
+
+                    task = (task_title, "To-Do", None, None, None, None, [day])  # Store the day in recurring_days
+                    self.tasks.add_task(date_str, task)
 
             messagebox.showinfo("Success", "To-Do task added to schedule!")
             todo_task_window.destroy()
@@ -468,8 +534,8 @@ class PlannerApp:
         today = datetime.date.today()
         days_of_week = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-        for date_str, task_list in self.tasks.copy().items():  # Iterate over a copy to avoid modification errors
-            for task in task_list.copy():
+        for date_str, task_list in self.tasks.items():  # items() is a snapshot, so adding tasks below is safe
+            for task in task_list:
                 title, task_type, time, location, reminder, image_path, recurring_days = task
                 if recurring_days:
                     try:
@@ -482,12 +548,10 @@ class PlannerApp:
                             # If the next occurrence is in the future, add the task
                             if next_occurrence > today:
                                 next_date_str = next_occurrence.strftime("%Y-%m-%d")
-                                if next_date_str in self.tasks:
-                                    self.tasks[next_date_str].append(
-                                        (title, task_type, time, location, reminder, image_path, recurring_days))
-                                else:
-                                    self.tasks[next_date_str] = [(
-                                        title, task_type, time, location, reminder, image_path, recurring_days)]
+                                # Generated occurrences belong to the permanent calendar and are not user edits,
+                                # so they stay out of undo history and are kept when a temporary edit is discarded
+                                self.tasks.add_base_task(next_date_str,
+                                                         (title, task_type, time, location, reminder, image_path, recurring_days))
 
                     except ValueError:
                         print(f"Invalid date format for recurring task: {title}")
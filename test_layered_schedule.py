@@ -0,0 +1,163 @@
+from layered_schedule import LayeredSchedule, _DELETED
+
+
+def make_task(title, time=None):
+    return (title, "General", time, None, None, None, [])
+
+
+def titles(schedule, date_str):
+    return [task[0] for task in schedule.get(date_str, ())]
+
+
+def recording_listener(schedule):
+    calls = []
+    schedule.listeners.append(lambda date_str, old, new: calls.append((date_str, [t[0] for t in old], [t[0] for t in new])))
+    return calls
+
+
+def test_deleting_last_task_in_base_drops_the_date():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.remove_tasks("2026-01-01", "a")
+    assert "2026-01-01" not in schedule
+    assert schedule.base.changes == {}
+    schedule.undo()
+    assert titles(schedule, "2026-01-01") == ["a"]
+
+
+def test_overlay_shares_base_and_only_stores_changed_days():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")], "2026-01-02": [make_task("b")]})
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    assert schedule.top.changes == {"2026-01-01": _DELETED}
+    assert "2026-01-01" not in schedule
+    assert schedule["2026-01-02"] is schedule.base.changes["2026-01-02"]
+
+
+def test_discard_restores_base():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.add_task("2026-01-02", make_task("b"))
+    assert schedule.discard_overlay()
+    assert schedule.keys() == ["2026-01-01"]
+    assert not schedule.is_temporary()
+    assert not schedule.discard_overlay()
+
+
+def test_undo_redo_inside_overlay_stays_in_overlay():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.add_task("2026-01-01", make_task("b"))
+    schedule.begin_overlay()
+    assert not schedule.can_undo()
+    schedule.add_task("2026-01-01", make_task("c"))
+    schedule.undo()
+    assert titles(schedule, "2026-01-01") == ["a", "b"]
+    assert not schedule.undo()
+    schedule.redo()
+    assert titles(schedule, "2026-01-01") == ["a", "b", "c"]
+
+
+def test_commit_is_one_undo_step():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.add_task("2026-01-02", make_task("b"))
+    schedule.add_task("2026-01-02", make_task("c"))
+    assert schedule.commit_overlay()
+    assert schedule.keys() == ["2026-01-02"]
+    assert "2026-01-01" not in schedule.base.changes
+    schedule.undo()
+    assert schedule.keys() == ["2026-01-01"]
+    schedule.redo()
+    assert schedule.keys() == ["2026-01-02"]
+    assert titles(schedule, "2026-01-02") == ["b", "c"]
+
+
+def test_nested_overlay_delete_commits_through_each_layer():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.begin_overlay()
+    schedule.add_task("2026-01-02", make_task("b"))
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.remove_tasks("2026-01-02", "b")
+    schedule.commit_overlay()
+    assert schedule.top.changes["2026-01-01"] is _DELETED  # Still hides the base day
+    assert "2026-01-02" not in schedule.top.changes  # Nothing below to hide
+    assert len(schedule) == 0
+    schedule.commit_overlay()
+    assert schedule.base.changes == {}
+
+
+def test_batch_is_one_undo_step():
+    schedule = LayeredSchedule()
+    schedule.add_task("2026-01-01", make_task("a"))
+    schedule.undo()
+    with schedule.batch():
+        for date_str in ("2026-01-05", "2026-01-07", "2026-01-09"):
+            schedule.add_task(date_str, make_task("todo"))
+    assert not schedule.can_redo()
+    schedule.undo()
+    assert len(schedule) == 0
+    schedule.redo()
+    assert schedule.keys() == ["2026-01-05", "2026-01-07", "2026-01-09"]
+
+
+def test_base_task_is_not_recorded_and_keeps_redo():
+    schedule = LayeredSchedule()
+    schedule.add_task("2026-01-01", make_task("a"))
+    schedule.add_task("2026-01-01", make_task("b"))
+    schedule.undo()
+    schedule.add_base_task("2026-01-01", make_task("recurring"))
+    assert schedule.can_redo()
+    schedule.undo()
+    assert titles(schedule, "2026-01-01") == ["recurring"]
+    schedule.redo()
+    schedule.redo()
+    assert titles(schedule, "2026-01-01") == ["recurring", "a", "b"]
+
+
+def test_base_task_survives_discard_and_commit():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.add_base_task("2026-01-01", make_task("recurring"))
+    schedule.add_base_task("2026-01-02", make_task("recurring"))
+    assert titles(schedule, "2026-01-01") == ["recurring"]
+    assert len(schedule.top.undo_stack) == 1  # Only the user's removal
+    schedule.discard_overlay()
+    assert titles(schedule, "2026-01-01") == ["a", "recurring"]
+    assert titles(schedule, "2026-01-02") == ["recurring"]
+
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.add_base_task("2026-01-01", make_task("recurring"))
+    schedule.commit_overlay()
+    assert titles(schedule, "2026-01-01") == ["recurring", "recurring"]
+
+
+def test_listeners_see_every_visible_change():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    calls = recording_listener(schedule)
+    schedule.add_task("2026-01-01", make_task("b"))
+    schedule.undo()
+    schedule.redo()
+    assert calls == [("2026-01-01", ["a"], ["a", "b"]),
+                     ("2026-01-01", ["a", "b"], ["a"]),
+                     ("2026-01-01", ["a"], ["a", "b"])]
+
+    calls.clear()
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    schedule.discard_overlay()
+    assert calls == [("2026-01-01", ["a", "b"], ["b"]),
+                     ("2026-01-01", ["b"], ["a", "b"])]
+
+    calls.clear()
+    schedule.begin_overlay()
+    schedule.remove_tasks("2026-01-01", "a")
+    calls.clear()
+    schedule.commit_overlay()
+    assert calls == []
+
+    schedule.add_base_task("2026-01-03", make_task("recurring"))
+    assert calls == [("2026-01-03", [], ["recurring"])]
@@ -0,0 +1,183 @@
+import collections
+import datetime
+import random
+import sys
+import threading
+
+import numpy as np
+
+from layered_schedule import LayeredSchedule
+from workload_analytics import WorkloadAnalytics, LOAD_COLORS, OVERLOAD_COLOR
+
+
+def make_task(title, task_type="General", time=None, location=None):
+    return (title, task_type, time, location, None, None, [])
+
+
+def brute_force(schedule, year):
+    days = 366 if year % 4 == 0 else 365
+    first = datetime.date(year, 1, 1).toordinal()
+    total = np.zeros(days, dtype=np.int32)
+    timed = np.zeros(days, dtype=np.int32)
+    occupancy = np.zeros((days, 24), dtype=np.int32)
+    types = collections.Counter()
+    locations = collections.Counter()
+    for date_str, task_list in schedule.items():
+        day = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        if day.year != year:
+            continue
+        index = day.toordinal() - first
+        for title, task_type, time, location, reminder, image_path, recurring_days in task_list:
+            total[index] += 1
+            types[task_type] += 1
+            if location:
+                locations[location] += 1
+            if time:
+                timed[index] += 1
+                try:
+                    occupancy[index, datetime.datetime.strptime(time, "%H:%M").hour] += 1
+                except ValueError:
+                    pass
+    return total, timed, occupancy, dict(types), dict(locations)
+
+
+def assert_matches(analytics, schedule, year):
+    total, timed, occupancy, types, locations = brute_force(schedule, year)
+    first = datetime.date(year, 1, 1)
+    for index in np.flatnonzero(total | timed):
+        date_str = (first + datetime.timedelta(days=int(index))).strftime("%Y-%m-%d")
+        assert analytics.tasks_on(date_str) == total[index]
+        assert analytics.timed_tasks_on(date_str) == timed[index]
+    if year in analytics.years:
+        assert (analytics.years[year].total == total).all()
+        assert (analytics.years[year].timed == timed).all()
+    assert (analytics.heatmap(year) == occupancy).all()
+    assert analytics.type_totals(year) == types
+    assert analytics.location_totals(year) == locations
+
+    weekdays = np.zeros((7, 24), dtype=np.int32)
+    for index in range(len(total)):
+        weekdays[(first + datetime.timedelta(days=index)).weekday()] += occupancy[index]
+    assert (analytics.weekday_heatmap(year) == weekdays).all()
+
+
+def random_task(rng):
+    time = rng.choice([None, None, "bad", f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"])
+    return make_task(f"t{rng.randrange(5)}", f"type{rng.randrange(12)}", time,
+                     rng.choice([None, "", f"place{rng.randrange(12)}"]))
+
+
+def test_incremental_updates_match_brute_force():
+    rng = random.Random(7)
+    schedule = LayeredSchedule({"2026-02-01": [make_task("seed", time="09:00")]})
+    analytics = WorkloadAnalytics(schedule)
+    dates = [f"{year}-{month:02d}-{day:02d}" for year in (2026, 2027) for month in (1, 6, 12) for day in (1, 15, 28)]
+    for _ in range(400):
+        action = rng.random()
+        date_str = rng.choice(dates)
+        if action < 0.35:
+            schedule.add_task(date_str, random_task(rng))
+        elif action < 0.45:
+            schedule.remove_tasks(date_str, f"t{rng.randrange(5)}")
+        elif action < 0.55:
+            schedule.add_base_task(date_str, random_task(rng))
+        elif action < 0.65:
+            schedule.undo()
+        elif action < 0.72:
+            schedule.redo()
+        elif action < 0.8:
+            schedule.begin_overlay()
+        elif action < 0.9:
+            schedule.discard_overlay()
+        else:
+            schedule.commit_overlay()
+    assert len(analytics.type_index) > 8 and len(analytics.location_index) > 8  # Columns had to grow
+    for year in (2026, 2027):
+        assert_matches(analytics, schedule, year)
+
+
+def test_queries_do_not_create_years():
+    schedule = LayeredSchedule({"2026-01-01": [make_task("a")]})
+    analytics = WorkloadAnalytics(schedule)
+    assert analytics.tasks_on("2030-01-01") == 0
+    assert analytics.timed_tasks_on("2030-01-01") == 0
+    assert analytics.heatmap(2030).sum() == 0
+    assert analytics.weekday_heatmap(2030).sum() == 0
+    assert list(analytics.month_colors(2030, 2)) == [""] * 28
+    assert analytics.busiest_days(year=2030) == []
+    assert analytics.overload_alerts(2030) == []
+    assert analytics.type_totals(2030) == {}
+    assert list(analytics.years) == [2026]
+
+
+def test_month_colors_agree_with_overload_alerts():
+    schedule = LayeredSchedule()
+    analytics = WorkloadAnalytics(schedule)
+    for hour in ("08:00", "10:00", "12:00"):
+        schedule.add_task("2026-03-02", make_task(hour, time=hour))  # Three timed tasks
+    schedule.add_task("2026-03-03", make_task("a", time="09:00"))
+    schedule.add_task("2026-03-03", make_task("b", time="09:30"))  # Same hour
+    schedule.add_task("2026-03-04", make_task("a"))
+    colors = analytics.month_colors(2026, 3)
+    assert analytics.overload_alerts() == ["2026-03-02", "2026-03-03"]
+    assert colors[1] == OVERLOAD_COLOR and colors[2] == OVERLOAD_COLOR
+    assert colors[3] == LOAD_COLORS[1]
+    assert colors[0] == ""
+    assert [analytics.is_overloaded(f"2026-03-0{day}") for day in range(1, 5)] == [False, True, True, False]
+    assert not analytics.is_overloaded("2030-01-01")
+
+
+def test_busiest_days_span_years():
+    schedule = LayeredSchedule()
+    analytics = WorkloadAnalytics(schedule)
+    schedule.add_task("2026-12-31", make_task("a"))
+    for title in "abc":
+        schedule.add_task("2027-01-01", make_task(title))
+    assert analytics.busiest_days() == [("2027-01-01", 3), ("2026-12-31", 1)]
+    assert analytics.overload_alerts() == []
+
+
+def test_concurrent_updates_and_reads():
+    schedule = LayeredSchedule()
+    analytics = WorkloadAnalytics(schedule)
+
+    def writer():
+        for index in range(300):
+            schedule.add_base_task(f"2026-05-{index % 28 + 1:02d}",
+                                   make_task("r", f"type{index}", "09:00", f"place{index}"))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        analytics.month_colors(2026, 5)
+        analytics.type_totals()
+        analytics.location_totals()
+    thread.join()
+    assert_matches(analytics, schedule, 2026)
+
+
+def test_concurrent_writers_on_the_same_day():
+    schedule = LayeredSchedule()
+    analytics = WorkloadAnalytics(schedule)
+    inserts = 500
+
+    def user_edits():
+        for index in range(inserts):
+            schedule.add_task("2026-05-01", make_task(f"user{index}"))
+
+    def recurring_edits():
+        for index in range(inserts):
+            schedule.add_base_task("2026-05-01", make_task(f"recurring{index}"))
+
+    threads = [threading.Thread(target=user_edits), threading.Thread(target=recurring_edits)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often enough to interleave inside an edit
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(schedule["2026-05-01"]) == 2 * inserts
+    assert analytics.tasks_on("2026-05-01") == 2 * inserts
@@ -0,0 +1,209 @@
+import calendar
+import datetime
+import threading
+import numpy as np
+
+HOURS_PER_DAY = 24
+BREAK_THRESHOLD = 2  # More than this many timed tasks in a day is an overload (see YearLoad.overloaded)
+LOAD_LEVELS = np.array([1, 3, 5])  # Tasks per day where each month view color starts
+LOAD_COLORS = np.array(["", "#d9f2d9", "#fff2b3", "#ffcc99"])  # Empty, light, moderate, busy
+OVERLOAD_COLOR = "#ff9999"  # Days that overload_alerts reports, whatever their task count
+
+
+class YearLoad:
+    def __init__(self, year, type_columns, location_columns):
+        days = 366 if calendar.isleap(year) else 365
+        self.first_ordinal = datetime.date(year, 1, 1).toordinal()
+        self.total = np.zeros(days, dtype=np.int32)  # Tasks per day
+        self.timed = np.zeros(days, dtype=np.int32)  # Tasks with a time set per day
+        self.occupancy = np.zeros((days, HOURS_PER_DAY), dtype=np.int32)  # Timed tasks starting in each hour
+        self.by_type = np.zeros((days, type_columns), dtype=np.int32)
+        self.by_location = np.zeros((days, location_columns), dtype=np.int32)
+
+    def overloaded(self):
+        # More timed tasks than BREAK_THRESHOLD, or two tasks starting in the same hour. The month
+        # view, overload_alerts and the app's break reminder all use this one rule.
+        return (self.timed > BREAK_THRESHOLD) | (self.occupancy.max(axis=1) > 1)
+
+    def date_strings(self, day_indexes):
+        return [datetime.date.fromordinal(self.first_ordinal + int(day)).strftime("%Y-%m-%d") for day in day_indexes]
+
+
+class WorkloadAnalytics:
+    # Keeps the schedule's workload as NumPy arrays, one YearLoad per calendar year, so
+    # heatmaps, rankings and alerts are single array passes instead of loops over tasks.
+    # It listens to the LayeredSchedule and only re-counts the days that change. Background
+    # threads edit the schedule too, so every update and query holds self.lock.
+
+    def __init__(self, tasks):
+        self.years = {}  # {year: YearLoad}
+        self.type_index = {}  # {task_type: column in YearLoad.by_type}
+        self.location_index = {}  # {location: column in YearLoad.by_location}
+        self.type_columns = 8
+        self.location_columns = 8
+        self.lock = threading.RLock()
+        with tasks.lock:  # No edit can slip in between the initial count and subscribing
+            self.apply_days([(date_str, (), task_list) for date_str, task_list in tasks.items()])
+            tasks.listeners.append(self.on_day_changed)
+
+    def on_day_changed(self, date_str, old_tasks, new_tasks):
+        self.apply_days([(date_str, old_tasks, new_tasks)])
+
+    def apply_days(self, changes):
+        # Flattens every task of every changed day into parallel columns, then adds them
+        # (+1 for new tasks, -1 for old ones) into the year arrays with np.add.at.
+        with self.lock:
+            rows = []
+            for date_str, old_tasks, new_tasks in changes:
+                try:
+                    day = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+                except ValueError:
+                    continue
+                for sign, task_list in ((-1, old_tasks), (1, new_tasks)):
+                    for task in task_list:
+                        title, task_type, time, location, reminder, image_path, recurring_days = task
+                        rows.append((day.year, day.toordinal(), sign, self.task_hour(time),
+                                     self.column(self.type_index, str(task_type)),
+                                     self.column(self.location_index, location) if location else -1))
+            if not rows:
+                return
+
+            years, ordinals, signs, hours, type_cols, location_cols = (np.array(column) for column in zip(*rows))
+            self.grow_columns()
+            for year in np.unique(years):
+                if int(year) not in self.years:
+                    self.years[int(year)] = YearLoad(int(year), self.type_columns, self.location_columns)
+                load = self.years[int(year)]
+                in_year = years == year
+                days = ordinals[in_year] - load.first_ordinal
+                year_signs = signs[in_year]
+                year_hours = hours[in_year]
+                year_locations = location_cols[in_year]
+                timed = year_hours != -1
+                placed = year_hours >= 0
+                located = year_locations >= 0
+
+                np.add.at(load.total, days, year_signs)
+                np.add.at(load.timed, days[timed], year_signs[timed])
+                np.add.at(load.occupancy, (days[placed], year_hours[placed]), year_signs[placed])
+                np.add.at(load.by_type, (days, type_cols[in_year]), year_signs)
+                np.add.at(load.by_location, (days[located], year_locations[located]), year_signs[located])
+
+    def task_hour(self, time):
+        # -1 means no time; -2 means a time that can't be placed on the hourly grid
+        if not time:
+            return -1
+        try:
+            return datetime.datetime.strptime(time, "%H:%M").hour
+        except ValueError:
+            return -2
+
+    def column(self, index, name):
+        if name not in index:
+            index[name] = len(index)
+        return index[name]
+
+    def grow_columns(self):
+        # Doubles the category columns of every year when a new task type or location overflows them
+        while len(self.type_index) > self.type_columns:
+            self.type_columns *= 2
+        while len(self.location_index) > self.location_columns:
+            self.location_columns *= 2
+        for load in self.years.values():
+            if load.by_type.shape[1] < self.type_columns:
+                load.by_type = np.pad(load.by_type, ((0, 0), (0, self.type_columns - load.by_type.shape[1])))
+            if load.by_location.shape[1] < self.location_columns:
+                load.by_location = np.pad(load.by_location,
+                                          ((0, 0), (0, self.location_columns - load.by_location.shape[1])))
+
+    def year_load(self, year):
+        # Read-only view of a year; years without tasks get an empty, unsaved YearLoad
+        if year in self.years:
+            return self.years[year]
+        return YearLoad(year, self.type_columns, self.location_columns)
+
+    def selected_years(self, year=None):
+        if year is not None:
+            return [self.years[year]] if year in self.years else []
+        return [self.years[key] for key in sorted(self.years)]
+
+    def day_counts(self, date_str):
+        day = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        with self.lock:
+            load = self.years.get(day.year)
+            if load is None:
+                return 0, 0
+            index = day.toordinal() - load.first_ordinal
+            return int(load.total[index]), int(load.timed[index])
+
+    def tasks_on(self, date_str):
+        return self.day_counts(date_str)[0]
+
+    def timed_tasks_on(self, date_str):
+        return self.day_counts(date_str)[1]
+
+    def is_overloaded(self, date_str):
+        day = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        with self.lock:
+            load = self.years.get(day.year)
+            if load is None:
+                return False
+            index = day.toordinal() - load.first_ordinal
+            return bool(load.timed[index] > BREAK_THRESHOLD or load.occupancy[index].max() > 1)
+
+    def heatmap(self, year):
+        # Day x hour occupancy for the whole year
+        with self.lock:
+            return self.year_load(year).occupancy.copy()
+
+    def weekday_heatmap(self, year):
+        # Weekday x hour occupancy for the year, Monday first
+        with self.lock:
+            load = self.year_load(year)
+            weekdays = (np.arange(len(load.total)) + datetime.date(year, 1, 1).weekday()) % 7
+            heatmap = np.zeros((7, HOURS_PER_DAY), dtype=np.int32)
+            np.add.at(heatmap, weekdays, load.occupancy)
+            return heatmap
+
+    def busiest_days(self, count=5, year=None):
+        with self.lock:
+            loads = self.selected_years(year)
+            if not loads:
+                return []
+            totals = np.concatenate([load.total for load in loads])
+            owners = np.repeat(np.arange(len(loads)), [len(load.total) for load in loads])
+            offsets = np.concatenate([np.arange(len(load.total)) for load in loads])
+            ranked = np.argsort(-totals, kind="stable")[:count]
+            ranked = ranked[totals[ranked] > 0]
+            return [(loads[owners[index]].date_strings([offsets[index]])[0], int(totals[index])) for index in ranked]
+
+    def overload_alerts(self, year=None):
+        alerts = []
+        with self.lock:
+            for load in self.selected_years(year):
+                alerts.extend(load.date_strings(np.flatnonzero(load.overloaded())))
+        return alerts
+
+    def type_totals(self, year=None):
+        with self.lock:
+            return self.category_totals(self.type_index, [load.by_type for load in self.selected_years(year)])
+
+    def location_totals(self, year=None):
+        with self.lock:
+            return self.category_totals(self.location_index, [load.by_location for load in self.selected_years(year)])
+
+    def category_totals(self, index, counts):
+        if not counts:
+            return {}
+        totals = sum(count.sum(axis=0) for count in counts)
+        return {name: int(totals[column]) for name, column in index.items() if totals[column]}
+
+    def month_colors(self, year, month):
+        # Background color for each day of the month, indexed by day - 1. Overloaded days
+        # use OVERLOAD_COLOR so the month view agrees with overload_alerts.
+        with self.lock:
+            load = self.year_load(year)
+            start = datetime.date(year, month, 1).toordinal() - load.first_ordinal
+            month_days = slice(start, start + calendar.monthrange(year, month)[1])
+            colors = LOAD_COLORS[np.searchsorted(LOAD_LEVELS, load.total[month_days], side="right")]
+            return np.where(load.overloaded()[month_days], OVERLOAD_COLOR, colors)